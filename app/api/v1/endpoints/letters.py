@@ -1,19 +1,153 @@
 import os
 import re
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
-from app.schemas.letter import LetterRequest, SuratTugasRequest, LembarPersetujuanRequest, PDFResponse, Person
-from app.services.pdf_generator import PDFGenerator
-from app.utils import parse_indonesian_date, preprocess_school_info, get_next_increment
+import time
+import orjson
+from collections import OrderedDict
+from functools import lru_cache
+from hashlib import blake2b
+from pathlib import Path
+from typing import List
+from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse, Response
+from app.schemas.letter import (
+    LetterRequest,
+    SuratTugasRequest,
+    LembarPersetujuanRequest,
+    SuratTugasContent,
+    LembarPersetujuanContent,
+    PDFResponse,
+    Person,
+)
+from app.services.pdf_generator import GeneratedPDF, PDFGenerator
+from app.utils import parse_indonesian_date, get_next_increment
 from app.core import get_logger
 from datetime import datetime
 
 router = APIRouter(tags=["letters"])
-pdf_service = PDFGenerator()
 logger = get_logger(__name__)
 
+
+@lru_cache(maxsize=1)
+def get_pdf_service() -> PDFGenerator:
+    """Lazily construct the shared PDFGenerator (warm Jinja2 environment)."""
+    return PDFGenerator()
+
+
+@lru_cache(maxsize=4)
+def _format_timestamp(fmt: str, second: int) -> str:
+    """strftime cached per wall-clock second; requests landing in the
+    same second share one locale-aware formatting call."""
+    return datetime.fromtimestamp(second).strftime(fmt)
+
+
+# Identifier sanitization for filenames: strip non-alphanumerics with one
+# precompiled regex, then uppercase and map spaces to underscores in a
+# single str.translate pass instead of a replace().upper() chain
+_IDENTIFIER_STRIP_RE = re.compile(r'[^a-zA-Z0-9\s]')
+_IDENTIFIER_TABLE = str.maketrans(" abcdefghijklmnopqrstuvwxyz", "_ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+
+def _sanitize_identifier(name: str) -> str:
+    # Truncated so the longest generated filename (prefix + identifier +
+    # date + increment) stays under the 255-byte filesystem limit and the
+    # download whitelist below
+    return _IDENTIFIER_STRIP_RE.sub('', name).translate(_IDENTIFIER_TABLE)[:200]
+
+
+# Whitelist for download filenames: one C-level fullmatch rejects
+# traversal, separators and oversized names before any path handling.
+# The length bound matches the 255-byte filename limit, so every file
+# the service can create is downloadable
+_SAFE_FN = re.compile(r"[A-Za-z0-9_.-]{1,251}\.pdf")
+
+
+class PDFFileResponse(FileResponse):
+    """FileResponse with 1 MiB chunks instead of Starlette's 64 KiB.
+
+    Multi-MB PDFs stream with far fewer read syscalls per download.
+    """
+    chunk_size = 1 << 20
+
+
+# Dedupe cache: identical payloads reuse the already-rendered PDF instead
+# of re-running WeasyPrint. Keyed on (output dir, canonical request JSON).
+# Entries expire after the TTL so server-stamped fields (the generated
+# tanggal_surat on lembar persetujuan) can never go stale.
+_PDF_CACHE_MAX = 512
+_PDF_CACHE_TTL = 300  # seconds
+_pdf_cache: "OrderedDict[bytes, tuple[float, GeneratedPDF]]" = OrderedDict()
+
+
+def _request_cache_key(request: BaseModel, pdf_service: PDFGenerator) -> bytes:
+    payload = f"{pdf_service.output_dir}|{request.model_dump_json()}"
+    return blake2b(payload.encode(), digest_size=16).digest()
+
+
+def _cached_pdf(key: bytes) -> GeneratedPDF | None:
+    entry = _pdf_cache.get(key)
+    if entry is not None:
+        expires_at, result = entry
+        if time.monotonic() < expires_at and os.path.exists(result.path):
+            _pdf_cache.move_to_end(key)
+            return result
+    _pdf_cache.pop(key, None)
+    return None
+
+
+def _remember_pdf(key: bytes, result: GeneratedPDF) -> None:
+    _pdf_cache[key] = (time.monotonic() + _PDF_CACHE_TTL, result)
+    while len(_pdf_cache) > _PDF_CACHE_MAX:
+        _pdf_cache.popitem(last=False)
+
+
+# The template set is fixed at deploy time, so the /templates payload is
+# serialized once at import instead of per request
+SUPPORTED_TEMPLATES = tuple(sorted(
+    p.stem for p in Path("app/templates/letters").glob("*.html")
+))
+_TEMPLATES_RESPONSE = orjson.dumps({
+    "templates": list(SUPPORTED_TEMPLATES),
+    "count": len(SUPPORTED_TEMPLATES)
+})
+
+
+@router.get("/templates", summary="List available letter templates")
+async def list_templates():
+    """
+    List the letter template types this service can render.
+
+    The response is precomputed at startup since templates only change
+    with a deployment.
+    """
+    return Response(content=_TEMPLATES_RESPONSE, media_type="application/json")
+
+
+def _to_generic_surat_tugas(request: SuratTugasRequest) -> LetterRequest:
+    """Convert a validated SuratTugasRequest to the generic service model.
+
+    model_construct skips re-validation: every field here is trusted
+    data already validated at the boundary.
+    """
+    return LetterRequest.model_construct(
+        template_type="surat_tugas",
+        nomor_surat=request.nomor_surat,
+        tanggal_surat=request.tanggal_surat,
+        perihal=request.perihal,
+        tempat_surat=request.tempat_surat,
+        school_info=request.school_info,
+        penandatangan=request.penandatangan,
+        content=SuratTugasContent.model_construct(
+            assignees=request.assignees,
+            details=request.details,
+            pembuka=request.pembuka,
+            penutup=request.penutup
+        )
+    )
+
+
 @router.post("/surat-tugas", response_model=PDFResponse, summary="Generate Surat Tugas PDF")
-async def generate_surat_tugas(request: SuratTugasRequest):
+async def generate_surat_tugas(request: SuratTugasRequest, force_regenerate: bool = False, pdf_service: PDFGenerator = Depends(get_pdf_service)):
     """
     Generate Surat Tugas (Assignment Letter) PDF document.
 
@@ -42,52 +176,86 @@ async def generate_surat_tugas(request: SuratTugasRequest):
     **Filename Format:** `SURAT_TUGAS_{FIRST_ASSIGNEE}_{dd-mm-yyyy}.pdf`
     """
     try:
-        logger.info(f"Generating Surat Tugas: {request.nomor_surat} for {request.school_info.nama_sekolah}")
+        logger.info("Generating Surat Tugas: %s for %s", request.nomor_surat, request.school_info.nama_sekolah)
 
-        # Pre-process School Info to remove redundant kelurahan/kecamatan
-        request.school_info = preprocess_school_info(request.school_info)
+        cache_key = _request_cache_key(request, pdf_service)
+        if not force_regenerate:
+            cached = _cached_pdf(cache_key)
+            if cached is not None:
+                logger.info("Reusing cached Surat Tugas PDF: %s", cached.name)
+                return PDFResponse(
+                    filename=cached.name,
+                    file_url=f"/api/v1/letters/download/{cached.name}",
+                    file_size=cached.size
+                )
 
         # Convert specific request to generic LetterRequest for the service
-        generic_request = LetterRequest(
-            template_type="surat_tugas",
-            nomor_surat=request.nomor_surat,
-            tanggal_surat=request.tanggal_surat,
-            perihal=request.perihal,
-            tempat_surat=request.tempat_surat,
-            school_info=request.school_info,
-            penandatangan=request.penandatangan,
-            content={
-                "assignees": request.assignees,
-                "details": request.details,
-                "pembuka": request.pembuka,
-                "penutup": request.penutup
-            }
-        )
+        generic_request = _to_generic_surat_tugas(request)
 
         # Custom Filename: SURAT_TUGAS_{NAME}_{dd-mm-yyyy}_{increment}.pdf
         first_assignee = request.assignees[0].nama if request.assignees else "UNKNOWN"
-        first_assignee = re.sub(r'[^a-zA-Z0-9\s]', '', first_assignee).replace(" ", "_").upper()
+        first_assignee = _sanitize_identifier(first_assignee)
         date_str = parse_indonesian_date(request.tanggal_surat)
         increment = get_next_increment("SURAT_TUGAS", first_assignee, date_str)
         custom_filename = f"SURAT_TUGAS_{first_assignee}_{date_str}_{increment}.pdf"
 
-        file_path = pdf_service.generate(generic_request, custom_filename=custom_filename)
-        filename = os.path.basename(file_path)
-        file_size = os.path.getsize(file_path)
+        # CPU-heavy render: worker pool when configured, else a thread
+        result = await pdf_service.generate_async(generic_request, custom_filename=custom_filename)
+        _remember_pdf(cache_key, result)
 
-        logger.info(f"Successfully generated Surat Tugas PDF: {filename} ({file_size} bytes)")
+        logger.info("Successfully generated Surat Tugas PDF: %s (%d bytes)", result.name, result.size)
 
         return PDFResponse(
-            filename=filename,
-            file_url=f"/api/v1/letters/download/{filename}",
-            file_size=file_size
+            filename=result.name,
+            file_url=f"/api/v1/letters/download/{result.name}",
+            file_size=result.size
         )
     except Exception as e:
-        logger.error(f"Failed to generate Surat Tugas PDF: {str(e)}")
+        logger.error("Failed to generate Surat Tugas PDF: %s", e)
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+@router.post("/surat-tugas/batch", response_model=PDFResponse, summary="Generate batched Surat Tugas PDF")
+async def generate_surat_tugas_batch(requests: List[SuratTugasRequest], pdf_service: PDFGenerator = Depends(get_pdf_service)):
+    """
+    Generate one multi-page PDF containing several Surat Tugas letters.
+
+    Font discovery and style setup are shared across the whole batch,
+    so mass exports cost far less than one request per letter.
+
+    **Request Body:** a non-empty JSON array of Surat Tugas requests.
+
+    **Response:**
+    Returns filename, download URL, and file size of the merged PDF.
+
+    **Filename Format:** `SURAT_TUGAS_BATCH_{dd-mm-yyyy}_{increment}.pdf`
+    """
+    if not requests:
+        raise HTTPException(status_code=422, detail="Batch must contain at least one request")
+
+    try:
+        logger.info("Generating Surat Tugas batch of %d letters", len(requests))
+
+        generic_requests = [_to_generic_surat_tugas(request) for request in requests]
+
+        date_str = _format_timestamp("%d-%m-%Y", int(time.time()))
+        increment = get_next_increment("SURAT_TUGAS", "BATCH", date_str)
+        custom_filename = f"SURAT_TUGAS_BATCH_{date_str}_{increment}.pdf"
+
+        result = await pdf_service.generate_batch_async(generic_requests, custom_filename)
+
+        logger.info("Successfully generated Surat Tugas batch PDF: %s (%d bytes)", result.name, result.size)
+
+        return PDFResponse(
+            filename=result.name,
+            file_url=f"/api/v1/letters/download/{result.name}",
+            file_size=result.size
+        )
+    except Exception as e:
+        logger.error("Failed to generate Surat Tugas batch PDF: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
 @router.post("/lembar-persetujuan", response_model=PDFResponse, summary="Generate Lembar Persetujuan PKL")
-async def generate_lembar_persetujuan(request: LembarPersetujuanRequest):
+async def generate_lembar_persetujuan(request: LembarPersetujuanRequest, force_regenerate: bool = False, pdf_service: PDFGenerator = Depends(get_pdf_service)):
     """
     Generate Lembar Persetujuan PKL (Internship Approval Letter) PDF.
 
@@ -109,65 +277,96 @@ async def generate_lembar_persetujuan(request: LembarPersetujuanRequest):
     **Filename Format:** `LEMBAR_PERSETUJUAN_{COMPANY}_{dd-mm-yyyy}.pdf`
     """
     try:
-        logger.info(f"Generating Lembar Persetujuan for {request.school_info.nama_sekolah}")
+        logger.info("Generating Lembar Persetujuan for %s", request.school_info.nama_sekolah)
 
-        request.school_info = preprocess_school_info(request.school_info)
+        cache_key = _request_cache_key(request, pdf_service)
+        if not force_regenerate:
+            cached = _cached_pdf(cache_key)
+            if cached is not None:
+                logger.info("Reusing cached Lembar Persetujuan PDF: %s", cached.name)
+                return PDFResponse(
+                    filename=cached.name,
+                    file_url=f"/api/v1/letters/download/{cached.name}",
+                    file_size=cached.size
+                )
 
+        now_second = int(time.time())
         students_as_persons = [Person(nama=s.nama) for s in request.students]
 
-        generic_request = LetterRequest(
+        # Trusted data from the validated LembarPersetujuanRequest; skip
+        # the redundant second validation pass.
+        generic_request = LetterRequest.model_construct(
             template_type="lembar_persetujuan",
             nomor_surat="PKL/PST/001",
-            tanggal_surat=datetime.now().strftime("%d %B %Y"),
+            tanggal_surat=_format_timestamp("%d %B %Y", now_second),
             perihal="LEMBAR PERSETUJUAN",
             school_info=request.school_info,
             penandatangan=students_as_persons[0],
-            content={
-                "students": request.students,
-                "nama_perusahaan": request.nama_perusahaan,
-                "tempat_tanggal": request.tempat_tanggal
-            }
+            content=LembarPersetujuanContent.model_construct(
+                students=request.students,
+                nama_perusahaan=request.nama_perusahaan,
+                tempat_tanggal=request.tempat_tanggal
+            )
         )
 
         # Custom Filename: LEMBAR_PERSETUJUAN_{COMPANY}_{DATE}_{increment}.pdf
-        company_name = re.sub(r'[^a-zA-Z0-9\s]', '', request.nama_perusahaan).replace(" ", "_").upper()
-        date_str = datetime.now().strftime("%d-%m-%Y")
+        company_name = _sanitize_identifier(request.nama_perusahaan)
+        date_str = _format_timestamp("%d-%m-%Y", now_second)
         increment = get_next_increment("LEMBAR_PERSETUJUAN", company_name, date_str)
         custom_filename = f"LEMBAR_PERSETUJUAN_{company_name}_{date_str}_{increment}.pdf"
 
-        file_path = pdf_service.generate(generic_request, custom_filename=custom_filename)
-        filename = os.path.basename(file_path)
-        file_size = os.path.getsize(file_path)
+        # CPU-heavy render: worker pool when configured, else a thread
+        result = await pdf_service.generate_async(generic_request, custom_filename=custom_filename)
+        _remember_pdf(cache_key, result)
 
-        logger.info(f"Successfully generated Lembar Persetujuan PDF: {filename} ({file_size} bytes)")
+        logger.info("Successfully generated Lembar Persetujuan PDF: %s (%d bytes)", result.name, result.size)
 
         return PDFResponse(
-            filename=filename,
-            file_url=f"/api/v1/letters/download/{filename}",
-            file_size=file_size
+            filename=result.name,
+            file_url=f"/api/v1/letters/download/{result.name}",
+            file_size=result.size
         )
     except Exception as e:
-        logger.error(f"Failed to generate Lembar Persetujuan PDF: {str(e)}")
+        logger.error("Failed to generate Lembar Persetujuan PDF: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
 @router.get("/download/{filename}", summary="Download generated PDF")
-async def download_letter(filename: str):
+async def download_letter(filename: str, pdf_service: PDFGenerator = Depends(get_pdf_service)):
     """
     Download a previously generated PDF file.
 
     Returns the PDF file as a downloadable attachment.
     Filenames are validated to prevent path traversal attacks.
     """
-    logger.info(f"Downloading PDF: {filename}")
+    logger.info("Downloading PDF: %s", filename)
 
-    # Basic path traversal protection
-    if ".." in filename or "/" in filename:
-        logger.warning(f"Invalid filename attempt: {filename}")
+    # Path traversal protection: whitelist match, no Path construction
+    # from untrusted input
+    if not _SAFE_FN.fullmatch(filename):
+        logger.warning("Invalid filename attempt: %s", filename)
         raise HTTPException(status_code=400, detail="Invalid filename")
 
-    file_path = f"output/{filename}"
-    if not os.path.exists(file_path):
-        logger.warning(f"File not found: {filename}")
+    file_path = os.path.join(pdf_service.output_dir_str, filename)
+
+    # One open covers the existence check, the stat for FileResponse
+    # headers and the readahead hint; a concurrent delete can only
+    # surface here as a clean 404
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+    except FileNotFoundError:
+        logger.warning("File not found: %s", filename)
         raise HTTPException(status_code=404, detail="File not found")
+    try:
+        stat_result = os.fstat(fd)
+        # Hint the kernel to read the whole file ahead sequentially
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
 
-    return FileResponse(file_path, media_type="application/pdf", filename=filename)
\ No newline at end of file
+    return PDFFileResponse(
+        file_path,
+        media_type="application/pdf",
+        filename=filename,
+        stat_result=stat_result
+    )
\ No newline at end of file
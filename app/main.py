@@ -1,19 +1,49 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from brotli_asgi import BrotliMiddleware
 from app.api.v1.router import api_router
+from app.api.v1.endpoints.letters import get_pdf_service
 from app.core import setup_logging, get_logger, AppException, ValidationMiddleware
+import asyncio
 import time
 import os
 
+# Run on uvloop so FileResponse can use the kernel sendfile path for
+# zero-copy PDF downloads (uvloop ships with uvicorn[standard])
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
 # Setup logging
 log_level = os.getenv("LOG_LEVEL", "INFO")
 setup_logging(log_level=log_level)
 logger = get_logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pre-compile templates once so the first request is served warm
+    pdf_service = get_pdf_service()
+    pdf_service.warmup()
+
+    # Optional multi-core rendering: PDF_WORKERS=N starts N pre-forked
+    # WeasyPrint workers; 0 (default) renders in-process on a thread
+    pdf_workers = int(os.getenv("PDF_WORKERS", "0"))
+    if pdf_workers > 0:
+        pdf_service.start_executor(pdf_workers)
+
+    yield
+
+    pdf_service.shutdown_executor()
+
+
 app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     title="Surat Sertif PKL Service",
     description="""
 API untuk generating dokumen PDF terkait PKL (Praktik Kerja Lapangan).
@@ -64,7 +94,7 @@ startup_time = time.time()
 @app.exception_handler(AppException)
 async def app_exception_handler(request: Request, exc: AppException):
     """Handle custom application exceptions."""
-    logger.error(f"{exc.code}: {exc.message}")
+    logger.error("%s: %s", exc.code, exc.message)
     return JSONResponse(
         status_code=400,
         content={
@@ -91,11 +121,15 @@ app.add_middleware(
 # Request validation middleware
 app.add_middleware(ValidationMiddleware)
 
-# Brotli compression for faster response delivery
-app.add_middleware(BrotliMiddleware, minimum_size=500, gzip_fallback=True)
-
-# Mount static files for logos/assets if needed
-# app.mount("/static", StaticFiles(directory="app/static"), name="static")
+# Brotli compression for faster response delivery.
+# PDF downloads are exempt: PDFs are already deflate-compressed, so
+# re-compressing wastes CPU and blocks the sendfile fast path.
+app.add_middleware(
+    BrotliMiddleware,
+    minimum_size=500,
+    gzip_fallback=True,
+    excluded_handlers=[r"^/api/v1/letters/download/"],
+)
 
 app.include_router(api_router, prefix="/api/v1")
 
@@ -0,0 +1,25 @@
+from app.schemas.letter import (
+    SchoolInfo,
+    Person,
+    KeyValueItem,
+    Student,
+    SuratTugasRequest,
+    LembarPersetujuanRequest,
+    SuratTugasContent,
+    LembarPersetujuanContent,
+    LetterRequest,
+    PDFResponse,
+)
+
+__all__ = [
+    "SchoolInfo",
+    "Person",
+    "KeyValueItem",
+    "Student",
+    "SuratTugasRequest",
+    "LembarPersetujuanRequest",
+    "SuratTugasContent",
+    "LembarPersetujuanContent",
+    "LetterRequest",
+    "PDFResponse",
+]
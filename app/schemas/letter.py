@@ -1,20 +1,42 @@
 from typing import List, Optional, Dict, Any, Union, Annotated
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 class SchoolInfo(BaseModel):
-    nama_sekolah: str = Field(..., description="Nama lengkap sekolah", examples=["SMK NEGERI 2 SINGOSARI"])
-    alamat_jalan: str = Field(..., description="Alamat jalan sekolah", examples=["Jalan Perusahaan No. 20"])
-    kelurahan: str | None = Field(None, description="Kelurahan/Desa", examples=["Tunjungtirto"])
-    kecamatan: str | None = Field(None, description="Kecamatan", examples=["Singosari"])
-    kab_kota: str = Field(..., description="Kabupaten/Kota", examples=["Kab. Malang"])
-    provinsi: str = Field(..., description="Provinsi", examples=["Jawa Timur"])
-    kode_pos: str | None = Field(None, description="Kode pos", examples=["65153"])
-    telepon: str | None = Field(None, description="Nomor telepon", examples=["(0341) 4345127"])
-    email: str | None = Field(None, description="Alamat email", examples=["smkn2singosari@yahoo.co.id"])
-    website: str | None = Field(None, description="Website sekolah", examples=["www.smkn2singosari.sch.id"])
-    logo_url: str | None = Field(None, description="URL logo sekolah", examples=["https://upload.wikimedia.org/wikipedia/commons/7/74/Coat_of_arms_of_East_Java.svg"])
+    nama_sekolah: str = Field(..., description="Nama lengkap sekolah")
+    alamat_jalan: str = Field(..., description="Alamat jalan sekolah")
+    kelurahan: str | None = Field(None, description="Kelurahan/Desa")
+    kecamatan: str | None = Field(None, description="Kecamatan")
+    kab_kota: str = Field(..., description="Kabupaten/Kota")
+    provinsi: str = Field(..., description="Provinsi")
+    kode_pos: str | None = Field(None, description="Kode pos")
+    telepon: str | None = Field(None, description="Nomor telepon")
+    email: str | None = Field(None, description="Alamat email")
+    website: str | None = Field(None, description="Website sekolah")
+    logo_url: str | None = Field(None, description="URL logo sekolah")
+
+    @model_validator(mode="before")
+    @classmethod
+    def _dedupe_address(cls, data):
+        """
+        Drop kelurahan/kecamatan when they already appear in alamat_jalan.
+
+        This fixes duplication like "Tunjungtirto, Tunjungtirto" in the
+        letterhead address and runs once during validation instead of as
+        a separate preprocessing pass in every endpoint.
+        """
+        if isinstance(data, dict):
+            addr = data.get("alamat_jalan")
+            if isinstance(addr, str):
+                addr_cf = addr.casefold()
+                for field in ("kelurahan", "kecamatan"):
+                    value = data.get(field)
+                    if isinstance(value, str) and value.casefold() in addr_cf:
+                        data[field] = None
+        return data
 
     model_config = {
+        "frozen": True,
+        "extra": "forbid",
         "json_schema_extra": {
             "examples": [
                 {
@@ -35,13 +57,15 @@ class SchoolInfo(BaseModel):
     }
 
 class Person(BaseModel):
-    nama: str = Field(..., description="Nama lengkap", examples=["SUMIJAH, S.Pd., M.Si."])
-    jabatan: str | None = Field(None, description="Jabatan/posisi", examples=["Kepala SMK Negeri 2 Singosari"])
-    nip: str | None = Field(None, description="Nomor Induk Pegawai", examples=["19700210 199802 2 009"])
-    pangkat: str | None = Field(None, description="Pangkat/golongan", examples=["Pembina Tk. I"])
-    instansi: str | None = Field(None, description="Instansi/lembaga", examples=["SMK Negeri 2 Singosari"])
+    nama: str = Field(..., description="Nama lengkap")
+    jabatan: str | None = Field(None, description="Jabatan/posisi")
+    nip: str | None = Field(None, description="Nomor Induk Pegawai")
+    pangkat: str | None = Field(None, description="Pangkat/golongan")
+    instansi: str | None = Field(None, description="Instansi/lembaga")
 
     model_config = {
+        "frozen": True,
+        "extra": "forbid",
         "json_schema_extra": {
             "examples": [
                 {
@@ -67,11 +91,13 @@ class Person(BaseModel):
     }
 
 class KeyValueItem(BaseModel):
-    label: str = Field(..., description="Label/key", examples=["Keperluan"])
-    value: str = Field(..., description="Nilai/value", examples=["Pengantaran Siswa Praktik Kerja Lapangan (PKL)"])
-    separator: str = Field(":", description="Pemisah antara label dan value", examples=[":"])
+    label: str = Field(..., description="Label/key")
+    value: str = Field(..., description="Nilai/value")
+    separator: str = Field(":", description="Pemisah antara label dan value")
 
     model_config = {
+        "frozen": True,
+        "extra": "forbid",
         "json_schema_extra": {
             "examples": [
                 {"label": "Keperluan", "value": "Pengantaran Siswa Praktik Kerja Lapangan (PKL)", "separator": ":"},
@@ -85,9 +111,11 @@ class KeyValueItem(BaseModel):
 
 
 class Student(BaseModel):
-    nama: str = Field(..., description="Nama lengkap siswa", examples=["CHANDA ZULIA LESTARI"])
+    nama: str = Field(..., description="Nama lengkap siswa")
 
     model_config = {
+        "frozen": True,
+        "extra": "forbid",
         "json_schema_extra": {
             "examples": [
                 {"nama": "CHANDA ZULIA LESTARI"},
@@ -99,10 +127,10 @@ class Student(BaseModel):
 # --- Specific Request Models ---
 
 class SuratTugasRequest(BaseModel):
-    nomor_surat: str = Field(..., description="Nomor surat", examples=["800/123/SMK.2/2024"])
-    tanggal_surat: str = Field(..., description="Tanggal surat dalam format Indonesia", examples=["1 Juli 2024"])
-    tempat_surat: str | None = Field(None, description="Tempat penerbitan surat", examples=["Singosari"])
-    perihal: str = Field("SURAT TUGAS", description="Perihal/subjek surat", examples=["SURAT TUGAS"])
+    nomor_surat: str = Field(..., description="Nomor surat")
+    tanggal_surat: str = Field(..., description="Tanggal surat dalam format Indonesia")
+    tempat_surat: str | None = Field(None, description="Tempat penerbitan surat")
+    perihal: str = Field("SURAT TUGAS", description="Perihal/subjek surat")
 
     school_info: SchoolInfo = Field(..., description="Informasi sekolah untuk kop surat")
     penandatangan: Person = Field(..., description="Pejabat penandatangan surat")
@@ -110,8 +138,8 @@ class SuratTugasRequest(BaseModel):
     assignees: List[Person] = Field(..., description="Daftar orang yang ditugaskan", min_length=1)
     details: List[KeyValueItem] = Field(..., description="Detail tugas dalam format key-value")
 
-    pembuka: str | None = Field(None, description="Kalimat pembuka surat", examples=["Kepala SMK Negeri 2 Singosari Dinas Pendidikan Kabupaten Malang menugaskan kepada :"])
-    penutup: str | None = Field(None, description="Kalimat penutup surat", examples=["Demikian surat tugas ini dibuat untuk dilaksanakan dengan sebaik-baiknya dan melaporkan hasilnya kepada kepala sekolah."])
+    pembuka: str | None = Field(None, description="Kalimat pembuka surat")
+    penutup: str | None = Field(None, description="Kalimat penutup surat")
 
     model_config = {
         "json_schema_extra": {
@@ -173,9 +201,9 @@ class LembarPersetujuanRequest(BaseModel):
 
     students: Annotated[List[Student], Field(min_length=1, description="Daftar siswa PKL")]
 
-    nama_perusahaan: str = Field(..., description="Nama perusahaan/DU/DI tempat PKL", examples=["JTV MALANG"])
+    nama_perusahaan: str = Field(..., description="Nama perusahaan/DU/DI tempat PKL")
 
-    tempat_tanggal: str | None = Field(None, description="Tempat dan tanggal surat", examples=["Malang, 12 Januari 2026"])
+    tempat_tanggal: str | None = Field(None, description="Tempat dan tanggal surat")
 
     model_config = {
         "json_schema_extra": {
@@ -204,6 +232,21 @@ class LembarPersetujuanRequest(BaseModel):
 
 # --- Generic/Legacy Request Models ---
 
+class SuratTugasContent(BaseModel):
+    """Typed content payload for the surat_tugas template."""
+    assignees: List[Person]
+    details: List[KeyValueItem]
+    pembuka: str | None = None
+    penutup: str | None = None
+
+
+class LembarPersetujuanContent(BaseModel):
+    """Typed content payload for the lembar_persetujuan template."""
+    students: List[Student]
+    nama_perusahaan: str
+    tempat_tanggal: str | None = None
+
+
 class LetterRequest(BaseModel):
     """Top level request to generate a letter (Generic)."""
     template_type: str = Field(..., description="Template name (e.g. surat_tugas)")
@@ -215,13 +258,19 @@ class LetterRequest(BaseModel):
     school_info: SchoolInfo
     penandatangan: Person
 
-    # Flexible content
-    content: Dict[str, Any]
+    # Typed payloads first so pydantic-core picks the specialized
+    # validator; the dict arm keeps ad-hoc/legacy callers working
+    content: Union[SuratTugasContent, LembarPersetujuanContent, Dict[str, Any]]
+
+    # Internal-only model (endpoints build it with model_construct, the
+    # generator only dumps it): defer the pydantic-core schema build to
+    # first use instead of paying it at import
+    model_config = {"defer_build": True}
 
 class PDFResponse(BaseModel):
-    filename: str = Field(..., description="Nama file PDF yang dihasilkan", examples=["SURAT_TUGAS_INASNI_DYAH_RAHMATIKA_01-07-2024.pdf"])
-    file_url: str = Field(..., description="URL untuk mengunduh file PDF", examples=["/api/v1/letters/download/SURAT_TUGAS_INASNI_DYAH_RAHMATIKA_01-07-2024.pdf"])
-    file_size: int = Field(..., description="Ukuran file dalam bytes", examples=[45678])
+    filename: str = Field(..., description="Nama file PDF yang dihasilkan")
+    file_url: str = Field(..., description="URL untuk mengunduh file PDF")
+    file_size: int = Field(..., description="Ukuran file dalam bytes")
 
     model_config = {
         "json_schema_extra": {
@@ -1,56 +1,250 @@
+import asyncio
+import logging
 import os
+import threading
 import time
+import orjson
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import blake2b
 from io import BytesIO
 from pathlib import Path
-from typing import Optional
-from jinja2 import Environment, FileSystemLoader, select_autoescape
-from weasyprint import HTML, CSS
-from weasyprint.text.fonts import FontConfiguration
+from typing import List, NamedTuple, Optional
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
 from app.schemas.letter import LetterRequest
 from app.core import get_logger
 
 logger = get_logger(__name__)
 
-# Singleton font configuration - reused across all PDF generations
-_font_config = FontConfiguration()
+# WeasyPrint is imported lazily: pulling in pango/cairo costs seconds
+# and should happen during warmup, never while a request waits
+HTML = None
+
+# Font configurations are kept per thread: FontConfiguration wraps a
+# pango font map whose internal locks serialize concurrent renders when
+# a single instance is shared across the thread pool
+_tls = threading.local()
+
+
+def _ensure_weasyprint():
+    global HTML
+    if HTML is None:
+        from weasyprint import HTML as _HTML
+
+        HTML = _HTML
+    return HTML
+
+
+def _fc():
+    font_config = getattr(_tls, "font_config", None)
+    if font_config is None:
+        from weasyprint.text.fonts import FontConfiguration
+
+        font_config = FontConfiguration()
+        _tls.font_config = font_config
+    return font_config
+
+# Rendered HTML is highly templated, so identical documents recur often;
+# cap the content-addressed PDF cache rather than letting it grow
+_PDF_BYTES_CACHE_MAX = 128
+
+# Shared across renders so school logos/SVGs are fetched and decoded
+# once per process instead of once per document
+_image_cache: dict = {}
+
+# One pass over nomor_surat maps every filesystem-hostile character to a
+# dash when building the default filename
+_FN_TABLE = str.maketrans({c: "-" for c in '/\\:*?"<>|'})
+
+
+class GeneratedPDF(NamedTuple):
+    """Result of a PDF generation: path on disk, basename and size in bytes."""
+    path: str
+    name: str
+    size: int
+
+
+# Per-process generator for the worker pool; each pre-forked worker keeps
+# its own warm Jinja environment and WeasyPrint state
+_worker_generator: Optional["PDFGenerator"] = None
+
+
+def _init_worker(templates_dir: str, output_dir: str) -> None:
+    """Warm up a worker process: build its generator and force WeasyPrint's
+    lazy pango/cairo initialization before the first real job."""
+    global _worker_generator
+    _worker_generator = PDFGenerator(templates_dir=templates_dir, output_dir=output_dir)
+    _worker_generator.warmup()
+
+
+def _render_in_worker(request: LetterRequest, custom_filename: Optional[str]) -> GeneratedPDF:
+    return _worker_generator.generate(request, custom_filename=custom_filename)
+
 
 class PDFGenerator:
     def __init__(self, templates_dir: str = "app/templates", output_dir: str = "output"):
         self.base_dir = Path(os.getcwd())
         self.templates_dir = self.base_dir / templates_dir
         self.output_dir = self.base_dir / output_dir
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        # str() of a Path re-joins its parts every call; resolve once
+        # here since the directory never moves after construction
+        self._templates_dir_str = str(self.templates_dir)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        # Persist compiled template bytecode across processes: restarted
+        # workers marshal.load instead of re-parsing each template
+        bytecode_dir = self.base_dir / ".jinja_cache"
+        bytecode_dir.mkdir(exist_ok=True)
 
         # Jinja2 environment with auto-caching
         self.env = Environment(
-            loader=FileSystemLoader(str(self.templates_dir)),
+            loader=FileSystemLoader(self._templates_dir_str),
             autoescape=select_autoescape(['html', 'xml']),
-            auto_reload=False  # Disable reload checks for production speed
+            auto_reload=False,  # Disable reload checks for production speed
+            cache_size=400,
+            bytecode_cache=FileSystemBytecodeCache(str(bytecode_dir))
         )
 
-    def generate(self, request: LetterRequest, custom_filename: Optional[str] = None) -> str:
+        # Direct name -> Template map on top of Jinja2's internal LRU;
+        # hot-path lookups skip its weakref/lock bookkeeping entirely
+        self._template_cache: dict = {}
+
+        # Content-addressed PDF bytes keyed on the rendered HTML: a hit
+        # skips WeasyPrint entirely. Locked because generate() runs on
+        # worker threads
+        self._pdf_bytes_cache: "OrderedDict[bytes, bytes]" = OrderedDict()
+        self._pdf_cache_lock = threading.Lock()
+
+    def _cached_pdf_bytes(self, key: bytes):
+        with self._pdf_cache_lock:
+            cached = self._pdf_bytes_cache.get(key)
+            if cached is not None:
+                self._pdf_bytes_cache.move_to_end(key)
+            return cached
+
+    def _remember_pdf_bytes(self, key: bytes, pdf_bytes: bytes) -> None:
+        with self._pdf_cache_lock:
+            self._pdf_bytes_cache[key] = pdf_bytes
+            while len(self._pdf_bytes_cache) > _PDF_BYTES_CACHE_MAX:
+                self._pdf_bytes_cache.popitem(last=False)
+
+    @property
+    def output_dir(self) -> Path:
+        return self._output_dir
+
+    @property
+    def output_dir_str(self) -> str:
+        return self._output_dir_str
+
+    @output_dir.setter
+    def output_dir(self, value) -> None:
+        # Keep the cached string form in sync so generate() can join
+        # paths with os.path instead of building Path objects per call
+        self._output_dir = Path(value)
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        self._output_dir_str = str(self._output_dir)
+
+    @staticmethod
+    def _write_atomic(output_path: str, pdf_bytes: bytes) -> None:
+        """Write to a temp name in the same directory and atomically
+        publish, so a concurrent download never sees a partial file."""
+        tmp_path = f"{output_path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o644)
+        try:
+            # os.write may write fewer bytes than asked; loop so the
+            # published file is never truncated
+            view = memoryview(pdf_bytes)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, output_path)
+
+    @staticmethod
+    def _build_context(request: LetterRequest) -> dict:
+        """Dump the request once and flatten its content dict to the top
+        level for easier access in templates (the 'content' key is kept
+        for backward compatibility)."""
+        # Round-tripping through JSON keeps both the serialize and parse
+        # in C (pydantic-core + orjson), beating the Python-level
+        # recursion of model_dump on requests with long student lists
+        context = orjson.loads(request.model_dump_json())
+        content = context.get('content')
+        if isinstance(content, dict):
+            context.update(content)
+        return context
+
+    def _get_template(self, template_name: str):
+        template = self._template_cache.get(template_name)
+        if template is None:
+            try:
+                template = self.env.get_template(template_name)
+            except Exception as e:
+                raise ValueError(f"Template '{template_name}' not found. Error: {e}")
+            self._template_cache[template_name] = template
+        return template
+
+    def warmup(self) -> None:
         """
-        Generates a PDF based on the letter request.
-        Returns the path to the generated PDF.
+        Pre-compile all letter templates so the first request never pays
+        the Jinja2 parse cost. Called once at app startup.
         """
-        start_time = time.time()
+        letters_dir = self.templates_dir / "letters"
+        for template_file in sorted(letters_dir.glob("*.html")):
+            self._get_template(f"letters/{template_file.name}")
 
-        template_name = f"letters/{request.template_type}.html"
-        try:
-            template = self.env.get_template(template_name)
-        except Exception as e:
-            raise ValueError(f"Template '{template_name}' not found. Error: {e}")
+        # Import WeasyPrint and render a dummy document so the
+        # pango/fontconfig scan runs now instead of on the first request
+        _ensure_weasyprint()
+        HTML(string="<p></p>").write_pdf(font_config=_fc())
+        logger.info("Template warmup complete")
+
+    def start_executor(self, max_workers: int) -> None:
+        """
+        Start a persistent pool of pre-forked render workers.
+
+        WeasyPrint holds the GIL during rendering, so thread offload alone
+        cannot use multiple cores. Workers import WeasyPrint and warm
+        their font configuration once at startup.
+        """
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(str(self.templates_dir), str(self.output_dir))
+        )
+        logger.info("Started PDF worker pool with %d workers", max_workers)
+
+    def shutdown_executor(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
 
-        # Prepare context
-        context = request.model_dump()
+    async def generate_async(self, request: LetterRequest, custom_filename: Optional[str] = None) -> GeneratedPDF:
+        """
+        Generate a PDF without blocking the event loop.
+
+        Dispatches to the worker pool when one is running (true multi-core
+        parallelism), otherwise falls back to a thread.
+        """
+        if self._executor is not None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, _render_in_worker, request, custom_filename
+            )
+        return await asyncio.to_thread(self.generate, request, custom_filename)
+
+    def generate(self, request: LetterRequest, custom_filename: Optional[str] = None) -> GeneratedPDF:
+        """
+        Generates a PDF based on the letter request.
+        Returns a GeneratedPDF with the path, basename and size of the file,
+        so callers don't need extra stat/basename calls.
+        """
+        start = time.perf_counter_ns()
 
-        # Flatten content dict to top level for easier access in templates
-        # (while keeping 'content' key for backward compatibility)
-        if 'content' in context and isinstance(context['content'], dict):
-            context.update(context['content'])
+        template = self._get_template(f"letters/{request.template_type}.html")
 
         # Render HTML
-        html_string = template.render(**context)
+        html_string = template.render(**self._build_context(request))
 
         # Determine filename
         if custom_filename:
@@ -58,35 +252,105 @@ class PDFGenerator:
             if not filename.endswith(".pdf"):
                 filename += ".pdf"
         else:
-            filename = f"{request.template_type}_{request.nomor_surat.replace('/', '-')}.pdf"
+            safe = request.nomor_surat.translate(_FN_TABLE)
+            filename = "".join((request.template_type, "_", safe, ".pdf"))
 
-        output_path = self.output_dir / filename
+        output_path = os.path.join(self._output_dir_str, filename)
 
-        # Generate PDF with cached font configuration
-        html_doc = HTML(string=html_string, base_url=str(self.templates_dir))
-        html_doc.write_pdf(str(output_path), font_config=_font_config)
+        # Identical rendered HTML yields identical PDF bytes; reuse them
+        cache_key = blake2b(html_string.encode(), digest_size=16).digest()
+        pdf_bytes = self._cached_pdf_bytes(cache_key)
+        if pdf_bytes is None:
+            _ensure_weasyprint()
+            # Generate PDF with cached font configuration
+            html_doc = HTML(string=html_string, base_url=self._templates_dir_str)
+            pdf_bytes = html_doc.write_pdf(
+                font_config=_fc(), optimize_images=True, cache=_image_cache
+            )
+            self._remember_pdf_bytes(cache_key, pdf_bytes)
+        file_size = len(pdf_bytes)
 
-        # Log timing
-        elapsed = time.time() - start_time
-        logger.info(f"PDF generated in {elapsed:.2f}s: {filename}")
+        self._write_atomic(output_path, pdf_bytes)
 
-        return str(output_path)
+        # Log timing; skip even the elapsed arithmetic when INFO is off
+        if logger.isEnabledFor(logging.INFO):
+            elapsed = (time.perf_counter_ns() - start) / 1e9
+            logger.info("PDF generated in %.2fs: %s", elapsed, filename)
 
-    def generate_bytes(self, request: LetterRequest) -> BytesIO:
+        return GeneratedPDF(path=output_path, name=filename, size=file_size)
+
+    def generate_batch(self, requests: List[LetterRequest], custom_filename: str) -> GeneratedPDF:
+        """
+        Render several letters into one multi-page PDF.
+
+        Font discovery and style-cascade setup are paid once for the
+        whole batch: each letter is laid out as its own Document and the
+        pages are merged before a single PDF emission.
+        """
+        start = time.perf_counter_ns()
+        _ensure_weasyprint()
+
+        documents = []
+        for request in requests:
+            template = self._get_template(f"letters/{request.template_type}.html")
+            html_string = template.render(**self._build_context(request))
+            documents.append(
+                HTML(string=html_string, base_url=self._templates_dir_str).render(
+                    font_config=_fc(), optimize_images=True, cache=_image_cache
+                )
+            )
+
+        pages = [page for document in documents for page in document.pages]
+        merged = documents[0].copy(pages)
+        pdf_bytes = merged.write_pdf()
+
+        filename = custom_filename
+        if not filename.endswith(".pdf"):
+            filename += ".pdf"
+        output_path = os.path.join(self._output_dir_str, filename)
+        self._write_atomic(output_path, pdf_bytes)
+
+        if logger.isEnabledFor(logging.INFO):
+            elapsed = (time.perf_counter_ns() - start) / 1e9
+            logger.info("Batch of %d PDFs generated in %.2fs: %s", len(requests), elapsed, filename)
+
+        return GeneratedPDF(path=output_path, name=filename, size=len(pdf_bytes))
+
+    async def generate_batch_async(self, requests: List[LetterRequest], custom_filename: str) -> GeneratedPDF:
+        return await asyncio.to_thread(self.generate_batch, requests, custom_filename)
+
+    def generate_bytes(self, request: LetterRequest, target=None) -> Optional[BytesIO]:
         """
         Generate PDF and return as BytesIO for streaming response.
         Faster for direct downloads without file I/O.
+
+        When a writable target is given, WeasyPrint streams straight into
+        it and None is returned, skipping the in-memory copy.
         """
-        template_name = f"letters/{request.template_type}.html"
-        try:
-            template = self.env.get_template(template_name)
-        except Exception as e:
-            raise ValueError(f"Template '{template_name}' not found. Error: {e}")
+        template = self._get_template(f"letters/{request.template_type}.html")
+
+        html_string = template.render(**self._build_context(request))
+
+        cache_key = blake2b(html_string.encode(), digest_size=16).digest()
+        pdf_bytes = self._cached_pdf_bytes(cache_key)
 
-        context = request.model_dump()
-        html_string = template.render(**context)
+        if target is not None:
+            if pdf_bytes is not None:
+                target.write(pdf_bytes)
+            else:
+                _ensure_weasyprint()
+                html_doc = HTML(string=html_string, base_url=self._templates_dir_str)
+                html_doc.write_pdf(
+                    target, font_config=_fc(), optimize_images=True, cache=_image_cache
+                )
+            return None
 
-        html_doc = HTML(string=html_string, base_url=str(self.templates_dir))
-        pdf_bytes = html_doc.write_pdf(font_config=_font_config)
+        if pdf_bytes is None:
+            _ensure_weasyprint()
+            html_doc = HTML(string=html_string, base_url=self._templates_dir_str)
+            pdf_bytes = html_doc.write_pdf(
+                font_config=_fc(), optimize_images=True, cache=_image_cache
+            )
+            self._remember_pdf_bytes(cache_key, pdf_bytes)
 
         return BytesIO(pdf_bytes)
@@ -1,5 +1,4 @@
 from .date_parser import parse_indonesian_date
-from .school_info import preprocess_school_info
 from .filename import get_next_increment
 
-__all__ = ["parse_indonesian_date", "preprocess_school_info", "get_next_increment"]
+__all__ = ["parse_indonesian_date", "get_next_increment"]
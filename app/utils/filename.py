@@ -1,5 +1,4 @@
-import re
-from pathlib import Path
+import os
 
 
 def get_next_increment(prefix: str, identifier: str, date_str: str) -> str:
@@ -14,18 +13,28 @@ def get_next_increment(prefix: str, identifier: str, date_str: str) -> str:
     Returns:
         Next increment as "001", "002", etc.
     """
-    output_dir = Path("output")
-    if not output_dir.exists():
-        return "001"
-
-    base_name = f"{prefix}_{identifier}_{date_str}"
-    pattern = re.compile(rf"^{re.escape(base_name)}_(\d{{3}})\.pdf$")
+    base_name = f"{prefix}_{identifier}_{date_str}_"
+    base_len = len(base_name)
+    # Matching names are exactly base + "NNN.pdf"; plain string checks
+    # replace the per-call regex build from before
+    expected_len = base_len + 7
 
     max_increment = 0
-    for file in output_dir.glob("*.pdf"):
-        match = pattern.match(file.name)
-        if match:
-            increment = int(match.group(1))
-            max_increment = max(max_increment, increment)
+    # os.scandir reads names straight from the directory stream; unlike
+    # Path.glob it never stats entries, so this stays one getdents pass
+    try:
+        with os.scandir("output") as entries:
+            for entry in entries:
+                name = entry.name
+                if (
+                    len(name) == expected_len
+                    and name.startswith(base_name)
+                    and name.endswith(".pdf")
+                    and name[base_len:base_len + 3].isdigit()
+                ):
+                    increment = int(name[base_len:base_len + 3])
+                    max_increment = max(max_increment, increment)
+    except FileNotFoundError:
+        return "001"
 
     return f"{max_increment + 1:03d}"
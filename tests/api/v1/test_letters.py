@@ -6,21 +6,28 @@ from pathlib import Path
 from fastapi.testclient import TestClient
 from app.main import app
 
+MALICIOUS_DOWNLOAD_PATHS = (
+    "../test.pdf",
+    "../../etc/passwd",
+    "..%2F..%2Fetc%2Fpasswd",
+    "file.pdf%00.txt",
+)
+
 
 @pytest.fixture
 def client(tmp_path):
     """Create test client with temporary output directory."""
-    # Patch the output directory for testing
-    import app.api.v1.endpoints.letters as letters_module
-    original_service = letters_module.pdf_service
-
+    # Override the PDF service dependency with a temp output directory
+    from app.api.v1.endpoints.letters import get_pdf_service
     from app.services.pdf_generator import PDFGenerator
-    letters_module.pdf_service = PDFGenerator(output_dir=str(tmp_path))
+
+    service = PDFGenerator(output_dir=str(tmp_path))
+    app.dependency_overrides[get_pdf_service] = lambda: service
 
     with TestClient(app) as test_client:
         yield test_client
 
-    letters_module.pdf_service = original_service
+    app.dependency_overrides.clear()
 
 
 @pytest.fixture
@@ -85,8 +92,18 @@ class TestHealthEndpoint:
         assert "uptime_seconds" in data
 
 
+class TestTemplatesEndpoint:
+    def test_list_templates(self, client):
+        response = client.get("/api/v1/letters/templates")
+        assert response.status_code == 200
+        data = response.json()
+        assert "surat_tugas" in data["templates"]
+        assert "lembar_persetujuan" in data["templates"]
+        assert data["count"] == len(data["templates"])
+
+
 class TestSuratTugasEndpoint:
-    def test_surat_tugas_success(self, client, sample_surat_tugas_payload, tmp_path):
+    def test_surat_tugas_success(self, client, sample_surat_tugas_payload):
         response = client.post("/api/v1/letters/surat-tugas", json=sample_surat_tugas_payload)
         assert response.status_code == 200
         data = response.json()
@@ -119,6 +136,20 @@ class TestSuratTugasEndpoint:
         assert response.status_code == 422  # Validation error
 
 
+class TestSuratTugasBatchEndpoint:
+    def test_batch_success(self, client, sample_surat_tugas_payload, tmp_path):
+        payload = [sample_surat_tugas_payload, sample_surat_tugas_payload]
+        response = client.post("/api/v1/letters/surat-tugas/batch", json=payload)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["filename"].startswith("SURAT_TUGAS_BATCH_")
+        assert (tmp_path / data["filename"]).exists()
+
+    def test_batch_empty_list(self, client):
+        response = client.post("/api/v1/letters/surat-tugas/batch", json=[])
+        assert response.status_code == 422
+
+
 class TestLembarPersetujuanEndpoint:
     def test_lembar_persetujuan_success(self, client, sample_lembar_persetujuan_payload):
         response = client.post("/api/v1/letters/lembar-persetujuan", json=sample_lembar_persetujuan_payload)
@@ -164,12 +195,9 @@ class TestDownloadEndpoint:
         response = client.get("/api/v1/letters/download/nonexistent.pdf")
         assert response.status_code == 404
 
-    def test_download_path_traversal_blocked(self, client):
-        # The route doesn't match due to path characters, so FastAPI returns 404
-        # This is still safe behavior - the file is not accessible
-        response = client.get("/api/v1/letters/download/../test.pdf")
-        assert response.status_code in (400, 404)
-
-    def test_download_slash_blocked(self, client):
-        response = client.get("/api/v1/letters/download/../../etc/passwd")
+    @pytest.mark.parametrize("malicious_path", MALICIOUS_DOWNLOAD_PATHS)
+    def test_download_traversal_blocked(self, client, malicious_path):
+        # Either the route doesn't match (404) or the filename whitelist
+        # rejects it (400); the file is never accessible either way
+        response = client.get(f"/api/v1/letters/download/{malicious_path}")
         assert response.status_code in (400, 404)
@@ -46,6 +46,42 @@ class TestSchoolInfo:
         with pytest.raises(ValidationError):
             SchoolInfo(**data)
 
+    def test_school_info_dedupes_kelurahan_in_address(self):
+        school = SchoolInfo(
+            nama_sekolah="SMK Test",
+            alamat_jalan="Jl. Test, Tunjungtirto",
+            kelurahan="Tunjungtirto",
+            kecamatan="Singosari",
+            kab_kota="Kab. Malang",
+            provinsi="Jawa Timur"
+        )
+        assert school.kelurahan is None
+        assert school.kecamatan == "Singosari"
+
+    def test_school_info_dedupes_kecamatan_case_insensitive(self):
+        school = SchoolInfo(
+            nama_sekolah="SMK Test",
+            alamat_jalan="Jl. Test, SINGOSARI",
+            kelurahan="Tunjungtirto",
+            kecamatan="Singosari",
+            kab_kota="Kab. Malang",
+            provinsi="Jawa Timur"
+        )
+        assert school.kecamatan is None
+        assert school.kelurahan == "Tunjungtirto"
+
+    def test_school_info_keeps_distinct_kelurahan_kecamatan(self):
+        school = SchoolInfo(
+            nama_sekolah="SMK Test",
+            alamat_jalan="Jl. Test No. 1",
+            kelurahan="Tunjungtirto",
+            kecamatan="Singosari",
+            kab_kota="Kab. Malang",
+            provinsi="Jawa Timur"
+        )
+        assert school.kelurahan == "Tunjungtirto"
+        assert school.kecamatan == "Singosari"
+
 
 class TestPerson:
     def test_person_with_all_fields(self):
@@ -7,16 +7,22 @@ from app.services.pdf_generator import PDFGenerator
 from app.schemas.letter import LetterRequest, SchoolInfo, Person
 
 
-@pytest.fixture
-def pdf_generator(tmp_path):
-    """Create PDFGenerator with temporary output directory."""
-    generator = PDFGenerator(output_dir=str(tmp_path))
-    return generator
+@pytest.fixture(scope="module")
+def _shared_generator(tmp_path_factory):
+    """Build the Jinja environment once for the whole module."""
+    return PDFGenerator(output_dir=str(tmp_path_factory.mktemp("output")))
 
 
 @pytest.fixture
+def pdf_generator(_shared_generator, tmp_path):
+    """Shared PDFGenerator repointed at a fresh per-test output dir."""
+    _shared_generator.output_dir = tmp_path
+    return _shared_generator
+
+
+@pytest.fixture(scope="module")
 def sample_letter_request():
-    """Create a sample letter request."""
+    """Create a sample letter request, shared read-only across tests."""
     return LetterRequest(
         template_type="surat_tugas",
         nomor_surat="800/123/SMK.2/2024",
@@ -54,29 +60,29 @@ class TestPDFGenerator:
         assert pdf_generator.output_dir.exists()
 
     def test_generate_creates_pdf_file(self, pdf_generator, sample_letter_request):
-        file_path = pdf_generator.generate(sample_letter_request)
-        assert Path(file_path).exists()
-        assert file_path.endswith(".pdf")
+        result = pdf_generator.generate(sample_letter_request)
+        assert Path(result.path).exists()
+        assert result.path.endswith(".pdf")
+        assert result.size > 0
 
     def test_generate_with_custom_filename(self, pdf_generator, sample_letter_request):
         custom_name = "CUSTOM_TEST.pdf"
-        file_path = pdf_generator.generate(sample_letter_request, custom_filename=custom_name)
-        assert file_path.endswith(custom_name)
+        result = pdf_generator.generate(sample_letter_request, custom_filename=custom_name)
+        assert result.name == custom_name
 
     def test_generate_custom_filename_without_extension(self, pdf_generator, sample_letter_request):
-        file_path = pdf_generator.generate(sample_letter_request, custom_filename="test")
-        assert file_path.endswith("test.pdf")
+        result = pdf_generator.generate(sample_letter_request, custom_filename="test")
+        assert result.name == "test.pdf"
 
     def test_generate_default_filename_format(self, pdf_generator, sample_letter_request):
-        file_path = pdf_generator.generate(sample_letter_request)
-        filename = Path(file_path).name
-        assert "surat_tugas" in filename
-        assert ".pdf" in filename
+        result = pdf_generator.generate(sample_letter_request)
+        assert "surat_tugas" in result.name
+        assert ".pdf" in result.name
 
     def test_generate_invalid_template_raises_error(self, pdf_generator, sample_letter_request):
-        sample_letter_request.template_type = "nonexistent_template"
+        request = sample_letter_request.model_copy(update={"template_type": "nonexistent_template"})
         with pytest.raises(ValueError, match="Template.*not found"):
-            pdf_generator.generate(sample_letter_request)
+            pdf_generator.generate(request)
 
     def test_generate_bytes(self, pdf_generator, sample_letter_request):
         pdf_bytes = pdf_generator.generate_bytes(sample_letter_request)
@@ -84,6 +90,6 @@ class TestPDFGenerator:
         assert len(pdf_bytes.getvalue()) > 0
 
     def test_generate_bytes_invalid_template(self, pdf_generator, sample_letter_request):
-        sample_letter_request.template_type = "invalid"
+        request = sample_letter_request.model_copy(update={"template_type": "invalid"})
         with pytest.raises(ValueError):
-            pdf_generator.generate_bytes(sample_letter_request)
+            pdf_generator.generate_bytes(request)